@@ -1,14 +1,14 @@
-import queue
-import threading
-import time
+import functools
 
-import cv2
-import numpy as np
 import streamlit as st
+import streamlit.components.v1 as components
 
-from detector_improved import detect_objects_detailed
+from camera_pipeline import CameraPipeline
+from config import UI_CONFIG
 from utils_improved import (get_camera_preset_urls, get_local_ip,
-                            test_camera_connection)
+                            setup_logging, test_camera_connection)
+
+setup_logging()
 
 # ------------------- Streamlit page config -------------------
 st.set_page_config(
@@ -20,48 +20,62 @@ st.set_page_config(
 # ------------------- Session State Initialization -------------------
 if 'camera_active' not in st.session_state:
     st.session_state.camera_active = False
-if 'stop_camera' not in st.session_state:
-    st.session_state.stop_camera = False
-if 'camera_thread' not in st.session_state:
-    st.session_state.camera_thread = None
-if 'frame_queue' not in st.session_state:
-    st.session_state.frame_queue = queue.Queue(maxsize=5)
-if 'stop_event' not in st.session_state:
-    st.session_state.stop_event = threading.Event()
-
-# ------------------- Camera Stream Thread -------------------
-def camera_stream(ip_url, frame_queue, stop_event, confidence_threshold):
-    """Capture frames from IP camera and perform object detection."""
-    cap = None
-    try:
-        cap = cv2.VideoCapture(ip_url)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        cap.set(cv2.CAP_PROP_FPS, 15)
-
-        if not cap.isOpened():
-            st.error("Failed to open camera. Check URL or connection.")
-            return
-
-        while not stop_event.is_set():
-            ret, frame = cap.read()
-            if not ret:
-                continue
-
-            try:
-                annotated_frame, detections, summary = detect_objects_detailed(frame, confidence=confidence_threshold)
-                annotated_frame = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
-            except Exception:
-                annotated_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                summary = {'total_objects': 0, 'classes': {}}
-
-            if not frame_queue.full():
-                frame_queue.put({'frame': annotated_frame, 'summary': summary})
-
-            time.sleep(0.033)  # ~30 FPS
-    finally:
-        if cap:
-            cap.release()
+if 'pipeline' not in st.session_state:
+    st.session_state.pipeline = CameraPipeline(mjpeg=UI_CONFIG['mjpeg_stream'])
+
+# ------------------- Cached Lookups -------------------
+# Sidebar values that would otherwise be recomputed on every rerun
+# (get_local_ip caches itself)
+@st.cache_data(ttl=300)
+def cached_preset_urls(ip):
+    return get_camera_preset_urls(ip)
+
+# ------------------- Camera Control -------------------
+def stop_camera():
+    """Stop button callback: stop the capture thread"""
+    st.session_state.camera_active = False
+    st.session_state.pipeline.stop()
+
+# ------------------- Live Display Fragments -------------------
+# These rerun on their own timer, so showing frames never blocks the
+# script thread and sidebar widgets stay responsive.
+@functools.lru_cache(maxsize=64)
+def objects_markdown(total_objects, class_counts):
+    """Detected-objects text; reused while the counts are unchanged"""
+    lines = "\n".join(f"• {cls}: {count}" for cls, count in class_counts)
+    return f"**Detected Objects:** {total_objects}\n{lines}\n"
+
+@st.fragment(run_every=UI_CONFIG['refresh_rate'])
+def live_video():
+    """Show the newest annotated frame (st.image mode only)"""
+    result = st.session_state.pipeline.latest()
+    if result is not None and result.frame is not None:
+        st.image(result.frame, channels="BGR", use_column_width=True)
+
+@st.fragment(run_every=UI_CONFIG['refresh_rate'])
+def live_status():
+    """Show stream status and FPS"""
+    pipeline = st.session_state.pipeline
+    result = pipeline.latest()
+    if not pipeline.is_running():
+        st.error("🔴 Camera stream ended")
+    elif result is None:
+        st.warning("🟡 Waiting for frames...")
+    else:
+        st.success(f"🟢 Live - FPS: {result.fps:.1f}")
+
+@st.fragment(run_every=UI_CONFIG['refresh_rate'])
+def live_objects():
+    """Show the objects detected in the newest frame"""
+    result = st.session_state.pipeline.latest()
+    if result is None:
+        return
+
+    summary = result.summary
+    if summary['total_objects'] > 0:
+        st.markdown(objects_markdown(summary['total_objects'], tuple(summary['classes'].items())))
+    else:
+        st.info("No objects detected")
 
 # ------------------- Main Function -------------------
 def main():
@@ -72,7 +86,7 @@ def main():
     with st.sidebar:
         st.header("📱 Camera Configuration")
         local_ip = get_local_ip()
-        preset_urls = get_camera_preset_urls(local_ip.replace(local_ip.split('.')[-1], '100'))
+        preset_urls = cached_preset_urls(local_ip.replace(local_ip.split('.')[-1], '100'))
         st.markdown("**Common DroidCam URLs:**")
         for name, url in preset_urls.items():
             st.code(url)
@@ -100,7 +114,7 @@ def main():
         with button_col1:
             start_button = st.button("🚀 Start Camera")
         with button_col2:
-            stop_button = st.button("⏹️ Stop Camera")
+            stop_button = st.button("⏹️ Stop Camera", on_click=stop_camera)
         with button_col3:
             test_connection = st.button("🔍 Test Connection")
 
@@ -121,26 +135,19 @@ def main():
         objects_placeholder = st.empty()
 
     # ------------------- Button Actions -------------------
+    pipeline = st.session_state.pipeline
+    pipeline.confidence = confidence_threshold  # picked up on the next frame
+
     if start_button and not st.session_state.camera_active:
-        if ip_url:
+        if not ip_url:
+            st.warning("Enter a valid camera URL")
+        elif pipeline.start(ip_url):
             st.session_state.camera_active = True
-            st.session_state.stop_camera = False
-            st.session_state.stop_event.clear()
-            if st.session_state.camera_thread is None or not st.session_state.camera_thread.is_alive():
-                st.session_state.camera_thread = threading.Thread(
-                    target=camera_stream,
-                    args=(ip_url, st.session_state.frame_queue, st.session_state.stop_event, confidence_threshold)
-                )
-                st.session_state.camera_thread.daemon = True
-                st.session_state.camera_thread.start()
             st.success("🟢 Camera started")
         else:
-            st.warning("Enter a valid camera URL")
+            st.error("Failed to open camera. Check URL or connection.")
 
-    if stop_button and st.session_state.camera_active:
-        st.session_state.stop_camera = True
-        st.session_state.camera_active = False
-        st.session_state.stop_event.set()
+    if stop_button:
         st.success("🟡 Camera stopped")
 
     if test_connection:
@@ -151,47 +158,20 @@ def main():
             else:
                 st.error(f"❌ {message}")
 
-    # ------------------- Display Loop -------------------
-    fps_counter = 0
-    start_time = time.time()
-    while st.session_state.camera_active and not st.session_state.stop_camera:
-        try:
-            result = st.session_state.frame_queue.get(timeout=1.0)
-            frame = result['frame']
-            summary = result['summary']
-            video_placeholder.image(frame, channels="RGB", use_column_width=True)
-
-            # FPS
-            fps_counter += 1
-            elapsed = time.time() - start_time
-            if elapsed > 1:
-                fps = fps_counter / elapsed
-                status_placeholder.success(f"🟢 Live - FPS: {fps:.1f}")
-                fps_counter = 0
-                start_time = time.time()
-
-            # Detection info
-            if show_info:
-                if summary['total_objects'] > 0:
-                    info_text = f"**Detected Objects:** {summary['total_objects']}\n"
-                    for cls, count in summary['classes'].items():
-                        info_text += f"• {cls}: {count}\n"
-                    objects_placeholder.markdown(info_text)
-                else:
-                    objects_placeholder.info("No objects detected")
-
-            time.sleep(0.01)
-        except queue.Empty:
-            status_placeholder.warning("🟡 Waiting for frames...")
-        except Exception as e:
-            status_placeholder.error(f"❌ Display error: {e}")
-            break
-
-    # Cleanup on stop
-    st.session_state.stop_event.set()
-    st.session_state.camera_active = False
-    if st.session_state.camera_thread is not None:
-        st.session_state.camera_thread.join(timeout=2)
+    # ------------------- Live Display -------------------
+    if st.session_state.camera_active:
+        with video_placeholder.container():
+            stream = pipeline.mjpeg_stream
+            if stream is not None:
+                components.iframe(f"http://{local_ip}:{stream.port}{stream.path}",
+                                  height=UI_CONFIG['video_width'] * 3 // 4)
+            else:
+                live_video()
+        with status_placeholder.container():
+            live_status()
+        if show_info:
+            with objects_placeholder.container():
+                live_objects()
 
 # ------------------- Run App -------------------
 if __name__ == "__main__":
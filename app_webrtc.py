@@ -9,10 +9,14 @@ except ImportError:
 
 import cv2
 import numpy as np
-from detector_improved import ObjectDetector
+from detector_improved import DetectionWorker, draw_detections
+from detector_improved import get_detector as get_shared_detector
+from utils_improved import setup_logging
 import threading
 import queue
 
+setup_logging()
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="WebRTC Object Detection",
@@ -28,24 +32,32 @@ RTC_CONFIGURATION = RTCConfiguration({
     "iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]
 })
 
-# Global variables for thread-safe communication
-detection_result_queue = queue.Queue()
-detector_instance = None
-
+@st.cache_resource
 def get_detector():
-    """Get or create detector instance"""
-    global detector_instance
-    if detector_instance is None:
-        detector_instance = ObjectDetector(confidence=0.5)
-    return detector_instance
+    """Get the shared, pre-warmed detector instance (survives script reloads)"""
+    return get_shared_detector(confidence=0.5)
 
 class VideoProcessor:
-    """Video frame processor for WebRTC"""
+    """
+    Video frame processor for WebRTC
 
-    def __init__(self):
-        self.confidence = 0.5
-        self.show_boxes = True
+    Lives as long as the stream, across script reruns (each rerun runs in
+    a fresh module, so module globals would not); it owns the stream's
+    detection worker and its latest result.
+    """
+
+    def __init__(self, confidence=0.5, show_boxes=True):
+        self.confidence = confidence
+        self.show_boxes = show_boxes
         self.detector = get_detector()
+        # recv draws the boxes itself, the worker only needs detections
+        self.worker = DetectionWorker(self.detector, annotate=False)
+        self.worker.start()
+        self.last_result = None
+
+    def on_ended(self):
+        """Called by streamlit-webrtc when the stream stops"""
+        self.worker.stop()
 
     def recv(self, frame):
         """Process incoming video frame"""
@@ -54,21 +66,20 @@ class VideoProcessor:
             img = frame.to_ndarray(format="bgr24")
 
             if self.show_boxes:
-                # Perform object detection
-                annotated_frame, detections, summary = self.detector.detect_objects_detailed(
-                    img, self.confidence
-                )
-
-                # Put detection results in queue for display
+                # Hand the frame to the detection thread and draw the newest
+                # finished boxes on the current frame without waiting for
+                # inference
+                self.worker.submit(img, self.confidence)
                 try:
-                    detection_result_queue.put_nowait({
-                        'detections': detections,
-                        'summary': summary
-                    })
-                except queue.Full:
-                    pass  # Skip if queue is full
-
-                return av.VideoFrame.from_ndarray(annotated_frame, format="bgr24")
+                    # Read by main() for the stats panel
+                    self.last_result = self.worker.get_result(timeout=0)
+                except queue.Empty:
+                    pass
+
+                if self.last_result is not None:
+                    # img is shared with the detection thread, draw on a copy
+                    img = draw_detections(img.copy(), self.last_result.detections)
+                return av.VideoFrame.from_ndarray(img, format="bgr24")
             else:
                 # Return original frame without detection
                 return av.VideoFrame.from_ndarray(img, format="bgr24")
@@ -129,21 +140,23 @@ def main():
     with col1:
         st.subheader("📹 Live Webcam Feed")
 
-        # Create video processor with current settings
-        video_processor = VideoProcessor()
-        video_processor.confidence = confidence_threshold
-        video_processor.show_boxes = show_detections
-
-        # WebRTC streamer
+        # WebRTC streamer; the processor is created once per session with
+        # the settings of the run that started it
         webrtc_ctx = webrtc_streamer(
             key="object-detection",
             mode=WebRtcMode.SENDRECV,
             rtc_configuration=RTC_CONFIGURATION,
-            video_processor_factory=lambda: video_processor,
+            video_processor_factory=lambda: VideoProcessor(confidence_threshold, show_detections),
             media_stream_constraints={"video": True, "audio": False},
             async_processing=True,
         )
 
+        # Push later setting changes to the live processor (plain attribute
+        # stores are atomic, recv picks them up on the next frame)
+        if webrtc_ctx.video_processor:
+            webrtc_ctx.video_processor.confidence = confidence_threshold
+            webrtc_ctx.video_processor.show_boxes = show_detections
+
         # Camera status
         if webrtc_ctx.state.playing:
             st.success("🟢 Camera is active")
@@ -157,31 +170,28 @@ def main():
             # Display detection results
             detection_placeholder = st.empty()
 
-            # Check for new detection results
-            try:
-                while not detection_result_queue.empty():
-                    result = detection_result_queue.get_nowait()
-
-                    with detection_placeholder.container():
-                        summary = result['summary']
-                        detections = result['detections']
-
-                        # Display summary stats
-                        if summary['total_objects'] > 0:
-                            st.metric("Objects Detected", summary['total_objects'])
-                            if 'avg_confidence' in summary:
-                                st.metric("Avg Confidence", f"{summary['avg_confidence']:.2f}")
-
-                            # Display detected classes
-                            if summary['classes']:
-                                st.markdown("**Detected Objects:**")
-                                for class_name, count in summary['classes'].items():
-                                    st.markdown(f"• {class_name}: {count}")
-                        else:
-                            st.info("No objects detected")
-
-            except queue.Empty:
-                pass
+            # Show the latest detection results of the running processor
+            processor = webrtc_ctx.video_processor
+            result = processor.last_result if processor else None
+
+            if result is not None:
+                with detection_placeholder.container():
+                    summary = result.summary
+                    detections = result.detections
+
+                    # Display summary stats
+                    if summary['total_objects'] > 0:
+                        st.metric("Objects Detected", summary['total_objects'])
+                        if 'avg_confidence' in summary:
+                            st.metric("Avg Confidence", f"{summary['avg_confidence']:.2f}")
+
+                        # Display detected classes
+                        if summary['classes']:
+                            st.markdown("**Detected Objects:**")
+                            for class_name, count in summary['classes'].items():
+                                st.markdown(f"• {class_name}: {count}")
+                    else:
+                        st.info("No objects detected")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,146 @@
+"""
+Shared camera capture/detection pipeline for the Streamlit apps
+"""
+
+import logging
+import threading
+import uuid
+
+from detector_improved import AdaptiveDetector, draw_detections, get_detector
+from mjpeg_server import get_mjpeg_server
+from utils_improved import (CameraStream, FPSCounter, FrameResult, LatestSlot,
+                            optimize_frame_for_detection)
+
+logger = logging.getLogger(__name__)
+
+class CameraPipeline:
+    """
+    Capture, detect and publish frames from one camera in the background
+
+    Capture (a CameraStream), detection and annotation/publishing run on
+    separate threads joined by single-slot buffers, so reading the next
+    frame and drawing/encoding the previous one both overlap with
+    detecting the current one, and each stage always starts on the newest
+    frame. Each processed frame is published to a LatestSlot as a
+    FrameResult; its frame is None when it went to an MJPEG stream instead.
+    """
+
+    def __init__(self, detector=None, mjpeg=False, confidence=0.5):
+        """
+        Args:
+            detector (ObjectDetector): Detector to use, the shared (already
+                warmed up) instance by default
+            mjpeg (bool): Stream frames to a stream of the shared MJPEG
+                server instead of the slot; falls back to the slot if the
+                server cannot start
+            confidence (float): Confidence threshold, may be changed while
+                running
+        """
+        self.detector = AdaptiveDetector(detector or get_detector())
+        self.mjpeg = mjpeg
+        self.mjpeg_stream = None  # this run's MJPEGStream, see start()
+        self.confidence = confidence
+        self.slot = LatestSlot()
+        self._stop_event = threading.Event()
+        self._stream = None
+        self._threads = []
+
+    def start(self, url):
+        """
+        Open the camera and start processing in the background
+
+        Args:
+            url (str): Camera URL
+
+        Returns:
+            bool: False if the camera could not be opened
+        """
+        self.stop()
+
+        # Fresh event and slots, so threads that are still winding down can
+        # neither be revived nor publish into the new session. Cameras often
+        # ignore the requested size; shrink before detection
+        stop_event = threading.Event()
+        stream = CameraStream(url, optimize_frame_for_detection, stop_event)
+        if not stream.start():
+            return False
+
+        self._stop_event = stop_event
+        self._stream = stream
+        self.mjpeg_stream = self._open_mjpeg_stream() if self.mjpeg else None
+        self.slot = LatestSlot()
+        detected_slot = LatestSlot()
+        self._threads = [
+            threading.Thread(target=self._detect, args=(stream.slot, detected_slot, stop_event),
+                             daemon=True),
+            threading.Thread(target=self._publish,
+                             args=(detected_slot, self.slot, self.mjpeg_stream, stop_event),
+                             daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return True
+
+    def stop(self, timeout=2):
+        """Signal the pipeline threads to stop and wait up to timeout seconds each"""
+        self._stop_event.set()
+        if self._stream is not None:
+            self._stream.stop(timeout=timeout)
+            self._stream = None
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        if self.mjpeg_stream is not None:
+            self.mjpeg_stream.server.remove_stream(self.mjpeg_stream.name)
+            self.mjpeg_stream = None
+
+    def _open_mjpeg_stream(self):
+        """A new stream on the shared MJPEG server, or None if it cannot start"""
+        try:
+            return get_mjpeg_server().stream(uuid.uuid4().hex)
+        except OSError as e:
+            logger.warning("MJPEG server unavailable, falling back to st.image: %s", e)
+            return None
+
+    def is_running(self):
+        """Whether the pipeline threads are alive"""
+        stream_alive = self._stream is not None and self._stream.is_running()
+        return stream_alive or any(thread.is_alive() for thread in self._threads)
+
+    def latest(self):
+        """Newest published result, or None before the first frame"""
+        return self.slot.peek()
+
+    def _detect(self, raw_slot, detected_slot, stop_event):
+        while not stop_event.is_set():
+            if not raw_slot.wait(timeout=0.5):
+                continue
+            frame = raw_slot.take()
+
+            try:
+                # Drawing happens on the publish thread
+                frame, detections, summary = self.detector.detect_objects_detailed(
+                    frame, self.confidence, annotate=False)
+            except Exception as e:
+                logger.error("Error in camera pipeline: %s", e)
+                detections = []
+                summary = {'total_objects': 0, 'classes': {}}
+
+            detected_slot.put((frame, detections, summary))
+
+    def _publish(self, detected_slot, slot, mjpeg_stream, stop_event):
+        fps_counter = FPSCounter()
+
+        while not stop_event.is_set():
+            if not detected_slot.wait(timeout=0.5):
+                continue
+            frame, detections, summary = detected_slot.take()
+
+            # The frame belongs to this pipeline, draw on it directly
+            annotated_frame = draw_detections(frame, detections)
+            if mjpeg_stream is not None:
+                # BGR frame goes straight to the stream
+                mjpeg_stream.update(annotated_frame)
+                annotated_frame = None
+
+            slot.put(FrameResult(annotated_frame, detections, summary, fps_counter.tick()))
@@ -8,6 +8,9 @@ from typing import Dict, Any
 # Model Configuration
 MODEL_CONFIG = {
     'default_model': 'yolov8n.pt',
+    # Quantized CPU models, tried in order when optimize_for_cpu is set
+    'int8_models': ['yolov8n_int8_openvino_model', 'yolov8n_int8.onnx'],
+    'int8_export': False,  # export the first one on startup if none exists (needs openvino + nncf)
     'available_models': [
         'yolov8n.pt',    # Nano - fastest, least accurate
         'yolov8s.pt',    # Small - good balance
@@ -18,6 +21,7 @@ MODEL_CONFIG = {
     'confidence_threshold': 0.5,
     'iou_threshold': 0.45,
     'max_detections': 300,
+    'imgsz': 640,  # fixed inference size, keeps compiled/exported input shapes stable
 }
 
 # Camera Configuration
@@ -25,6 +29,7 @@ CAMERA_CONFIG = {
     'default_resolution': (640, 480),
     'max_fps': 30,
     'buffer_size': 1,
+    'backend': 'opencv',  # 'opencv' or 'av' (PyAV, lower latency on network streams)
     'timeout': 5000,  # milliseconds
     'retry_attempts': 3,
     'retry_delay': 1,  # seconds
@@ -37,6 +42,7 @@ NETWORK_CONFIG = {
     'connection_timeout': 5,  # seconds
     'scan_timeout': 1,  # seconds for network scanning
     'default_protocol': 'http',
+    'mjpeg_port': 8000,  # port for the MJPEG video stream
 }
 
 # UI Configuration
@@ -49,6 +55,8 @@ UI_CONFIG = {
     'show_fps': True,
     'show_detection_info': True,
     'refresh_rate': 0.033,  # ~30 FPS
+    'mjpeg_stream': True,  # stream video over MJPEG instead of st.image
+    'jpeg_quality': 80,
 }
 
 # Performance Configuration
@@ -57,6 +65,16 @@ PERFORMANCE_CONFIG = {
     'frame_queue_size': 5,
     'processing_threads': 1,
     'memory_limit_mb': 512,
-    'gpu_enabled': False,  # Set to True if GPU available
+    'gpu_enabled': False,  # run the shared detector on CUDA when a GPU is available (FP16 on tensor-core GPUs)
     'optimize_for_cpu': True,
+    'tensorrt': False,  # with gpu_enabled, build and run a TensorRT FP16 engine (needs tensorrt)
+    'opencv_dnn': False,  # with gpu_enabled, run an ONNX export through cv2.dnn (needs OpenCV built with CUDA)
+    'direct_inference': False,  # run the PyTorch model on preallocated input buffers, bypassing the ultralytics predictor
+    'torch_threads': None,  # CPU inference threads, None = half the cores
+    'use_ipex': False,  # optimize the CPU model with Intel Extension for PyTorch when installed
+    'torch_compile': False,  # torch.compile the PyTorch model (slow first start, faster inference)
+    'use_opencl': False,  # resize frames via OpenCL (cv2.UMat) when available
+    'detect_every_n': 2,  # detect 1 in N frames while inference is slower than the camera
+    'static_frame_threshold': 3.0,  # reuse the last detections while no cell of an 8x6 grid changed more than this (0 = off)
+    'static_max_age': 1.0,  # seconds; detect at least this often even in a static scene
 }
@@ -2,16 +2,156 @@ import torch
 import cv2
 import numpy as np
 from ultralytics import YOLO
+from ultralytics.data.augment import LetterBox
+from ultralytics.engine.results import Results
 from ultralytics.nn.tasks import DetectionModel
+from ultralytics.utils import ops
+from ultralytics.utils.plotting import colors
+try:
+    from ultralytics.utils.nms import non_max_suppression
+except ImportError:  # ultralytics < 8.4 keeps it in ops
+    non_max_suppression = ops.non_max_suppression
 import logging
+import importlib.util
+import os
+import shutil
+import threading
+import time
+from collections.abc import Sequence
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from config import CAMERA_CONFIG, MODEL_CONFIG, PERFORMANCE_CONFIG
+from utils_improved import FrameResult, LatestSlot
+
+# Library logger; the apps configure handlers (see utils_improved.setup_logging)
+logger = logging.getLogger("spotai.detector")
 
 # Allowlist DetectionModel to fix unpickling errors
 torch.serialization.add_safe_globals([DetectionModel])
 
+def _count_classes(class_ids):
+    """
+    Count occurrences of each class ID
+
+    Args:
+        class_ids (numpy.ndarray): Integer class IDs
+
+    Returns:
+        tuple: (unique_ids, counts) as NumPy arrays
+    """
+    counts = np.bincount(class_ids)
+    ids = np.flatnonzero(counts)
+    return ids, counts[ids]
+
+def _one_time_export(target, required_pkgs, export_fn, what, fallback):
+    """
+    Run a model export that is kept on disk and reused on later starts
+
+    Skipped unless required_pkgs are already installed, so ultralytics
+    never pip-installs them itself; a failed export leaves a
+    <target>.failed marker file and is not retried on later starts
+    (delete the marker to retry).
+
+    Args:
+        target (str): Where the exported model is kept
+        required_pkgs (tuple): Packages the export needs
+        export_fn (callable): Runs the export and returns the exported path
+        what (str): Export name for log messages, e.g. "INT8 export"
+        fallback (str): What runs instead, for log messages
+
+    Returns:
+        str or None: Exported path, or None if the export was skipped or failed
+    """
+    failed_marker = target + ".failed"
+    if os.path.exists(failed_marker):
+        return None
+    missing = [pkg for pkg in required_pkgs if importlib.util.find_spec(pkg) is None]
+    if missing:
+        logger.warning("%s needs %s, using %s", what, ", ".join(missing), fallback)
+        return None
+
+    try:
+        return export_fn()
+    except Exception as e:
+        logger.warning("%s failed, using %s: %s", what, fallback, e)
+        with open(failed_marker, "w") as f:
+            f.write(f"{e}\n")
+        return None
+
+def draw_detections(frame, detections):
+    """
+    Draw boxes and labels onto a frame in place
+
+    Uses the same per-class colours as ultralytics' result.plot().
+
+    Args:
+        frame (numpy.ndarray): BGR image to draw on
+        detections (Detections or list): Detections to draw
+
+    Returns:
+        numpy.ndarray: The same frame, annotated
+    """
+    if isinstance(detections, Detections):
+        # Read the arrays directly instead of building detection dicts
+        rows = zip(detections.boxes.tolist(), detections.confidences.tolist(),
+                   detections.class_ids.tolist(), detections.class_names.tolist())
+    else:
+        rows = ((d['box'], d['confidence'], d['class_id'], d['class_name']) for d in detections)
+
+    for (x1, y1, x2, y2), confidence, class_id, class_name in rows:
+        color = colors(class_id, True)
+        label = f"{class_name} {confidence:.2f}"
+
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        (text_w, text_h), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        cv2.rectangle(frame, (x1, y1 - text_h - 4), (x1 + text_w, y1), color, -1)
+        cv2.putText(frame, label, (x1, y1 - 3), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                    (255, 255, 255), 1, cv2.LINE_AA)
+
+    return frame
+
+class Detections(Sequence):
+    """
+    Detections of one frame, stored as parallel NumPy arrays
+
+    Behaves like the list of detection dictionaries callers already use
+    ('box', 'confidence', 'class_id', 'class_name'), but the dictionaries
+    are only built the first time an item is accessed; summaries and
+    drawing can work on the arrays directly.
+    """
+
+    def __init__(self, boxes, confidences, class_ids, class_names):
+        """
+        Args:
+            boxes (numpy.ndarray): (N, 4) int32 xyxy boxes
+            confidences (numpy.ndarray): (N,) float32 scores
+            class_ids (numpy.ndarray): (N,) int16 class IDs
+            class_names (numpy.ndarray): (N,) class name strings
+        """
+        self.boxes = boxes
+        self.confidences = confidences
+        self.class_ids = class_ids
+        self.class_names = class_names
+        self._dicts = None
+
+    def __len__(self):
+        return len(self.class_ids)
+
+    def __getitem__(self, index):
+        return self._as_dicts()[index]
+
+    def __iter__(self):
+        return iter(self._as_dicts())
+
+    def _as_dicts(self):
+        if self._dicts is None:
+            self._dicts = [
+                {'box': box, 'confidence': confidence, 'class_id': class_id, 'class_name': class_name}
+                for box, confidence, class_id, class_name in zip(
+                    self.boxes.tolist(), self.confidences.tolist(),
+                    self.class_ids.tolist(), self.class_names.tolist())
+            ]
+        return self._dicts
+
 class ObjectDetector:
     def __init__(self, model_path="yolov8n.pt", confidence=0.5, device="cpu"):
         """
@@ -27,95 +167,510 @@ class ObjectDetector:
         self.device = device
         self.model = None
         self.class_names = None
+        self._class_names_arr = None
+        self.dtype = torch.float32
+        self._net = None  # cv2.dnn network, see _load_dnn_net
+        self._compile = False  # torch.compile on warmup, see _compile_model
+        self._square_input = False  # letterbox every frame to imgsz x imgsz, see warmup
+        self._batchable = False  # exported models take one frame per call
+        self._direct = False  # bypass the ultralytics predictor, see _direct_predict
+        self._letterbox = None
+        self._host_buf = None
+        self._input_buf = None
+        self._direct_lock = threading.Lock()  # the buffers above are shared by all callers
+        self._dnn_lock = threading.Lock()  # cv2.dnn.Net keeps its input and outputs as state
 
         self._load_model()
 
+    def _int8_model_path(self):
+        """
+        Path of the quantized CPU model to use instead of the default weights
+
+        Uses the first of MODEL_CONFIG['int8_models'] found on disk, and
+        exports one if there is none and MODEL_CONFIG['int8_export'] is set.
+
+        Returns:
+            str or None: INT8 model path if CPU optimization applies
+        """
+        if not PERFORMANCE_CONFIG['optimize_for_cpu']:
+            return None
+        if self.model_path != MODEL_CONFIG['default_model']:
+            return None  # only substitute the stock weights
+
+        for int8_path in MODEL_CONFIG['int8_models']:
+            if os.path.exists(int8_path):
+                return int8_path
+
+        if not MODEL_CONFIG['int8_export']:
+            return None
+        return self._export_int8(MODEL_CONFIG['int8_models'][0])
+
+    def _export_int8(self, int8_path):
+        """
+        Export the default weights to an INT8 OpenVINO model
+
+        Calibration uses ultralytics' default dataset (downloaded on first
+        export). Needs openvino and nncf, see _one_time_export.
+
+        Args:
+            int8_path (str): Where to keep the exported model
+
+        Returns:
+            str or None: int8_path, or None if the export failed
+        """
+        def export():
+            logger.info("Exporting INT8 OpenVINO model to %s (one-time)", int8_path)
+            exported = YOLO(self.model_path).export(format="openvino", int8=True,
+                                                    imgsz=MODEL_CONFIG['imgsz'], dynamic=False)
+            exported = str(exported).rstrip("/\\")
+            if os.path.abspath(exported) != os.path.abspath(int8_path):
+                shutil.move(exported, int8_path)
+            return int8_path
+
+        return _one_time_export(int8_path, ("openvino", "nncf"), export,
+                                "INT8 export", "FP32 weights")
+
+    def _engine_path(self):
+        """
+        Path of the TensorRT engine to use on NVIDIA GPUs
+
+        The engine is built from the weights on first use and kept next to
+        them; building takes several minutes and needs tensorrt, see
+        _one_time_export.
+
+        Returns:
+            str or None: Engine path, or None if TensorRT is disabled or the
+            build failed
+        """
+        if not PERFORMANCE_CONFIG['tensorrt']:
+            return None
+
+        engine_path = os.path.splitext(self.model_path)[0] + ".engine"
+        if os.path.exists(engine_path):
+            return engine_path
+
+        def export():
+            logger.info("Building TensorRT engine %s (one-time)", engine_path)
+            return str(YOLO(self.model_path).export(format="engine", half=True,
+                                                    imgsz=MODEL_CONFIG['imgsz'],
+                                                    dynamic=False, workspace=4))
+
+        return _one_time_export(engine_path, ("tensorrt",), export,
+                                "TensorRT export", "PyTorch")
+
     def _load_model(self):
         """Load the YOLO model"""
         try:
-            logger.info(f"Loading YOLO model: {self.model_path}")
-            self.model = YOLO(self.model_path)
-
-            # Set model to evaluation mode and move to device
-            if self.device == "cuda" and torch.cuda.is_available():
-                self.model.to("cuda")
-                logger.info("Model loaded on GPU")
+            use_cuda = self.device == "cuda" and torch.cuda.is_available()
+            engine_path = self._engine_path() if use_cuda else None
+            int8_path = None if use_cuda else self._int8_model_path()
+
+            if engine_path:
+                # The engine owns its device buffers and precision
+                logger.info("Loading TensorRT engine: %s", engine_path)
+                self.model = YOLO(engine_path, task="detect")
+                self.dtype = torch.float16
+                logger.info("Model loaded on GPU (TensorRT FP16)")
+            elif int8_path:
+                # Exported models run on OpenVINO / ONNX Runtime and cannot be moved
+                logger.info("Loading INT8 YOLO model: %s", int8_path)
+                self.model = YOLO(int8_path, task="detect")
+                logger.info("Model loaded on CPU (INT8)")
             else:
-                self.model.to("cpu")
-                logger.info("Model loaded on CPU")
+                logger.info("Loading YOLO model: %s", self.model_path)
+                self.model = YOLO(self.model_path)
+
+                # Set model to evaluation mode and move to device
+                if use_cuda:
+                    self.model.to("cuda")
+                    # Tensor-core GPUs (compute capability 7.0+) run FP16 much faster
+                    if torch.cuda.get_device_capability()[0] >= 7:
+                        self.dtype = torch.float16
+                    logger.info("Model loaded on GPU (%s)", self.dtype)
+                else:
+                    self.model.to("cpu")
+                    self._configure_cpu()
+                    logger.info("Model loaded on CPU")
+
+                self._compile = PERFORMANCE_CONFIG['torch_compile']
+                self._batchable = True
+                self._direct = PERFORMANCE_CONFIG['direct_inference']
+                if use_cuda and PERFORMANCE_CONFIG['opencv_dnn']:
+                    self._net = self._load_dnn_net()
 
             # Get class names
             self.class_names = self.model.names
-            logger.info(f"Model loaded successfully with {len(self.class_names)} classes")
+            # Lookup table so class IDs map to names with one array index
+            self._class_names_arr = np.array(
+                [self.class_names.get(i, f"Class_{i}") for i in range(max(self.class_names) + 1)],
+                dtype=object)
+            logger.info("Model loaded successfully with %d classes", len(self.class_names))
 
         except Exception as e:
-            logger.error(f"Error loading model: {e}")
+            logger.error("Error loading model: %s", e)
             raise
 
-    def detect_objects_detailed(self, frame, conf_threshold=None):
+    def _load_dnn_net(self):
+        """
+        Load an ONNX export of the model into OpenCV's DNN module
+
+        The export is created next to the weights on first use and run on
+        the CUDA backend in FP16.
+
+        Returns:
+            cv2.dnn.Net or None: None if OpenCV has no CUDA support or the
+            network could not be loaded
+        """
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() == 0:
+                logger.warning("OpenCV was built without CUDA, not using cv2.dnn")
+                return None
+
+            onnx_path = os.path.splitext(self.model_path)[0] + ".onnx"
+            if not os.path.exists(onnx_path):
+                logger.info("Exporting ONNX model to %s (one-time)", onnx_path)
+                onnx_path = self.model.export(format="onnx", imgsz=MODEL_CONFIG['imgsz'],
+                                              opset=12, dynamic=False)
+
+            net = cv2.dnn.readNetFromONNX(str(onnx_path))
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+            logger.info("Model loaded into cv2.dnn (CUDA FP16)")
+            return net
+
+        except Exception as e:
+            logger.warning("cv2.dnn unavailable, using PyTorch: %s", e)
+            return None
+
+    def _configure_cpu(self):
+        """
+        Tune PyTorch for CPU inference
+
+        Limits intra-op threads (ultralytics' default of one per core
+        competes with the capture and UI threads) and optionally applies
+        Intel Extension for PyTorch.
+        """
+        torch.set_num_threads(PERFORMANCE_CONFIG['torch_threads'] or max(1, (os.cpu_count() or 2) // 2))
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # can only be set before the first parallel op, e.g. on reload
+
+        if PERFORMANCE_CONFIG['use_ipex']:
+            try:
+                import intel_extension_for_pytorch as ipex
+                self.model.fuse()  # fuse before IPEX rewrites the layers
+                self.model.model = ipex.optimize(self.model.model.eval())
+                logger.info("Model optimized with Intel Extension for PyTorch")
+            except ImportError:
+                logger.warning("intel_extension_for_pytorch not installed, skipping IPEX")
+
+    def _compile_model(self, frame):
+        """
+        Compile the PyTorch network with torch.compile
+
+        Runs from warmup, once the first inference has built the network
+        that is actually called: the predictor's backend wraps (and fuses)
+        its own reference to it, so compiling YOLO.model beforehand would
+        be bypassed. The compiled network is checked against the eager one
+        on the warmup frame and must be called by the next inference; on
+        any failure or mismatch the eager network is kept.
+
+        Args:
+            frame (numpy.ndarray): Warmup frame, already run once
+
+        Returns:
+            bool: Whether the compiled network is in use
+        """
+        if self._direct:
+            owner = self.model  # the direct path calls YOLO.model itself
+        else:
+            owner = self.model.predictor.model
+            # ultralytics 8.4+ AutoBackend forwards through its backend object
+            # and only exposes backend.model via __getattr__
+            owner = owner.__dict__.get("backend", owner)
+        eager = owner.model
+
+        def first(output):
+            return output[0] if isinstance(output, (list, tuple)) else output
+
+        try:
+            with torch.inference_mode():
+                x = self._input_buf if self._direct else self.model.predictor.preprocess([frame])
+                expected = first(eager(x)).clone()
+
+                compiled = torch.compile(eager.eval(), mode="reduce-overhead",
+                                         fullgraph=False, dynamic=False)
+                actual = first(compiled(x)).clone()
+
+            if not torch.allclose(expected.float(), actual.float(), rtol=1e-2, atol=1e-2):
+                logger.warning("torch.compile changed the model output, running eagerly")
+                return False
+
+            owner.model = compiled
+            calls = []
+            hook = compiled.register_forward_pre_hook(lambda *args: calls.append(1))
+            try:
+                self._run_model([frame], self.confidence)  # raises here if the predictor rejects it
+            finally:
+                hook.remove()
+            if not calls:
+                raise RuntimeError("inference does not call the compiled network")
+            logger.info("Model compiled with torch.compile")
+            return True
+
+        except Exception as e:
+            owner.model = eager
+            logger.warning("torch.compile unavailable, running eagerly: %s", e)
+            return False
+
+    def warmup(self, shape=(480, 640, 3)):
+        """
+        Run one inference on a blank frame
+
+        Triggers lazy model setup (predictor, backend sessions, kernel
+        selection, torch.compile if enabled) so the first real frame is not
+        delayed by it. A compiled graph is specialized to one input shape,
+        so once compiled every frame is letterboxed to imgsz x imgsz rather
+        than to its own aspect ratio, and warmup uses that shape instead.
+
+        Args:
+            shape (tuple): Frame shape to warm up with
+        """
+        compile_now = self._compile and self._net is None
+        self._compile = False  # only once
+        if compile_now:
+            # Trace at the shape the compiled graph will run at
+            self._square_input = True
+            shape = (MODEL_CONFIG['imgsz'], MODEL_CONFIG['imgsz'], 3)
+        frame = np.zeros(shape, dtype=np.uint8)
+        self.detect_objects_detailed(frame)
+
+        if compile_now:
+            # Square letterboxing only pays off with the compiled graph
+            self._square_input = self._compile_model(frame)
+
+    def detect_objects_detailed(self, frame, conf_threshold=None, annotate=True,
+                                raise_errors=False):
         """
         Detect objects in a frame with detailed results
 
         Args:
             frame (numpy.ndarray): Input image frame
             conf_threshold (float): Override confidence threshold
+            annotate (bool): Draw the detections onto a copy of the frame;
+                if False the input frame is returned as is
+            raise_errors (bool): Raise inference errors instead of logging
+                them and returning an empty result
 
         Returns:
             tuple: (annotated_frame, detections_list, summary_dict)
         """
+        return self.detect_batch([frame], conf_threshold, annotate, raise_errors)[0]
+
+    def detect_batch(self, frames, conf_threshold=None, annotate=True, raise_errors=False):
+        """
+        Detect objects in several frames with one model call
+
+        Batching spreads the per-call overhead over all frames, which pays
+        off for recorded video or several cameras. Live streams should keep
+        using detect_objects_detailed on the newest frame. Backends with a
+        fixed batch size (exported models, cv2.dnn, the direct path) run
+        the frames one call at a time.
+
+        Args:
+            frames (list): Input image frames
+            conf_threshold (float): Override confidence threshold
+            annotate (bool): Draw the detections onto copies of the frames
+            raise_errors (bool): Raise inference errors instead of logging
+                them and returning empty results
+
+        Returns:
+            list: One (annotated_frame, detections_list, summary_dict) tuple
+            per frame, in order
+        """
+        empty = [(frame, [], {"total_objects": 0, "classes": {}}) for frame in frames]
         if self.model is None:
             logger.error("Model not loaded")
-            return frame, [], {"total_objects": 0, "classes": {}}
+            return empty
+        if not frames:
+            return []
 
         try:
             # Use provided threshold or default
             conf = conf_threshold if conf_threshold is not None else self.confidence
 
-            # Run inference
-            results = self.model(frame, conf=conf, verbose=False)
+            results = self._run_model(frames, conf)
+            return [self._parse_result(result, annotate) for result in results]
+
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error("Error during object detection: %s", e)
+            return empty
+
+    def _run_model(self, frames, conf):
+        """
+        Run inference on the active backend, raising on failure
+
+        Args:
+            frames (list): Input image frames
+            conf (float): Confidence threshold
+
+        Returns:
+            list: ultralytics Results, one per frame
+        """
+        # inference_mode also skips autograd version counters
+        with torch.inference_mode():
+            if self._net is not None:
+                return [self._dnn_predict(frame, conf) for frame in frames]
+            if self._direct:
+                return [self._direct_predict(frame, conf) for frame in frames]
+            kwargs = dict(conf=conf, imgsz=MODEL_CONFIG['imgsz'], verbose=False)
+            if self.dtype == torch.float16:
+                kwargs['half'] = True  # any explicit half logs a deprecation warning, so only pass it for FP16
+            if self._square_input:
+                kwargs['rect'] = False  # keep the compiled input shape constant
+            if self._batchable:
+                return self.model(frames, **kwargs)
+            # ONNX/OpenVINO/TensorRT exports have a fixed batch size of 1
+            return [self.model(frame, **kwargs)[0] for frame in frames]
+
+    def _direct_predict(self, frame, conf):
+        """
+        Run one frame through the PyTorch network without the predictor
 
-            # Get detection results
-            detections = []
-            if results and len(results) > 0:
-                result = results[0]
+        The letterboxed frame is copied into a preallocated host buffer
+        (pinned on CUDA) and on into a persistent input tensor on the
+        device, so a fixed-size stream allocates no new input tensors per
+        frame. The buffers are shared, so concurrent callers (several
+        pipelines or WebRTC workers on the get_detector() instance) run one
+        at a time. NMS uses MODEL_CONFIG's IoU threshold and detection limit.
 
-                # Extract detection information
-                if result.boxes is not None:
-                    boxes = result.boxes.xyxy.cpu().numpy()  # Bounding boxes
-                    confidences = result.boxes.conf.cpu().numpy()  # Confidence scores
-                    class_ids = result.boxes.cls.cpu().numpy().astype(int)  # Class IDs
+        Args:
+            frame (numpy.ndarray): Input BGR frame
+            conf (float): Confidence threshold
 
-                    for i, (box, confidence, class_id) in enumerate(zip(boxes, confidences, class_ids)):
-                        x1, y1, x2, y2 = box
-                        class_name = self.class_names.get(class_id, f"Class_{class_id}")
+        Returns:
+            ultralytics.engine.results.Results: Result for the frame
+        """
+        with self._direct_lock:
+            imgsz = MODEL_CONFIG['imgsz']
+            net = self.model.model
+            device = next(net.parameters()).device
+
+            if self._input_buf is None:
+                self.model.fuse()
+                if self.dtype == torch.float16:
+                    net.half()
+                self._letterbox = LetterBox(new_shape=(imgsz, imgsz), auto=False)
+                self._host_buf = torch.empty((imgsz, imgsz, 3), dtype=torch.uint8,
+                                             pin_memory=device.type == "cuda")
+                self._input_buf = torch.empty((1, 3, imgsz, imgsz), dtype=self.dtype, device=device)
+
+            # BGR HWC uint8 -> RGB NCHW in [0, 1], reusing both buffers
+            self._host_buf.numpy()[...] = self._letterbox(image=frame)[..., ::-1]
+            self._input_buf[0].copy_(self._host_buf.permute(2, 0, 1), non_blocking=True)
+            self._input_buf.div_(255)
+
+            preds = net(self._input_buf)
+            det = non_max_suppression(preds, conf, MODEL_CONFIG['iou_threshold'],
+                                      max_det=MODEL_CONFIG['max_detections'])[0]
+            det[:, :4] = ops.scale_boxes(self._input_buf.shape[2:], det[:, :4], frame.shape)
+
+            return Results(frame, path="", names=self.class_names, boxes=det)
+
+    def _dnn_predict(self, frame, conf):
+        """
+        Run one frame through the cv2.dnn network
 
-                        detections.append({
-                            'box': [int(x1), int(y1), int(x2), int(y2)],
-                            'confidence': float(confidence),
-                            'class_id': int(class_id),
-                            'class_name': class_name
-                        })
+        Decodes the raw (4 + classes, anchors) YOLOv8 output and applies
+        class-aware NMS with cv2.dnn, using MODEL_CONFIG's IoU threshold
+        and detection limit. The network is stateful, so concurrent callers
+        (several pipelines or WebRTC workers on the get_detector() instance)
+        run it one at a time; decoding runs outside the lock.
 
-                # Plot annotations on frame
-                annotated_frame = result.plot()
+        Args:
+            frame (numpy.ndarray): Input BGR frame
+            conf (float): Confidence threshold
 
-                # Create summary
-                summary = self.get_detection_summary(detections)
+        Returns:
+            ultralytics.engine.results.Results: Result for the frame
+        """
+        imgsz = MODEL_CONFIG['imgsz']
+        with self._dnn_lock:
+            if self._letterbox is None:
+                self._letterbox = LetterBox(new_shape=(imgsz, imgsz), auto=False)
+
+            blob = cv2.dnn.blobFromImage(self._letterbox(image=frame), 1 / 255.0, swapRB=True)
+            self._net.setInput(blob)
+            # Copy out of the network's output blob before the next caller reuses it
+            out = self._net.forward()[0].T.copy()  # (anchors, 4 + classes)
+
+        scores = out[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences >= conf
+
+        det = np.zeros((0, 6), dtype=np.float32)
+        if keep.any():
+            # cx, cy, w, h -> x, y, w, h as NMSBoxes expects
+            xywh = out[keep, :4].copy()
+            xywh[:, :2] -= xywh[:, 2:] / 2
+            confidences, class_ids = confidences[keep], class_ids[keep]
+
+            idx = cv2.dnn.NMSBoxesBatched(xywh.tolist(), confidences.tolist(), class_ids.tolist(),
+                                          conf, MODEL_CONFIG['iou_threshold'])
+            idx = np.asarray(idx, dtype=int).reshape(-1)[:MODEL_CONFIG['max_detections']]
+            det = np.column_stack([xywh[idx, :2], xywh[idx, :2] + xywh[idx, 2:],
+                                   confidences[idx], class_ids[idx]]).astype(np.float32)
+
+        det = torch.from_numpy(det)
+        det[:, :4] = ops.scale_boxes((imgsz, imgsz), det[:, :4], frame.shape)
+        return Results(frame, path="", names=self.class_names, boxes=det)
+
+    def _parse_result(self, result, annotate=True):
+        """
+        Turn one ultralytics result into the detection tuple
 
-                return annotated_frame, detections, summary
-            else:
-                return frame, [], {"total_objects": 0, "classes": {}}
+        Args:
+            result (ultralytics.engine.results.Results): Result for one frame
+            annotate (bool): Draw the detections onto a copy of the frame
 
-        except Exception as e:
-            logger.error(f"Error during object detection: {e}")
-            return frame, [], {"total_objects": 0, "classes": {}}
+        Returns:
+            tuple: (annotated_frame, detections_list, summary_dict)
+        """
+        # Get detection results
+        detections = []
+
+        # Extract detection information
+        if result.boxes is not None:
+            # One device-to-host copy of the (N, 6) xyxy/conf/cls tensor
+            # instead of one per field
+            data = result.boxes.data.cpu().numpy()
+            boxes = data[:, :4].astype(np.int32)  # Bounding boxes
+            confidences = data[:, -2].astype(np.float32)  # Confidence scores
+            class_ids = data[:, -1].astype(np.int16)  # Class IDs
+            class_names = self._class_names_arr[class_ids]
+
+            detections = Detections(boxes, confidences, class_ids, class_names)
+
+        # Draw annotations on a copy, leaving the caller's frame untouched
+        annotated_frame = result.orig_img
+        if annotate:
+            annotated_frame = draw_detections(annotated_frame.copy(), detections)
+
+        # Create summary
+        summary = self.get_detection_summary(detections)
+
+        return annotated_frame, detections, summary
 
     def get_detection_summary(self, detections):
         """
         Get a summary of detections
 
         Args:
-            detections (list): List of detection dictionaries
+            detections (Detections or list): Detections of one frame
 
         Returns:
             dict: Summary statistics
@@ -123,25 +678,197 @@ class ObjectDetector:
         if not detections:
             return {"total_objects": 0, "classes": {}}
 
-        class_counts = {}
-        for detection in detections:
-            class_name = detection['class_name']
-            class_counts[class_name] = class_counts.get(class_name, 0) + 1
+        if isinstance(detections, Detections):
+            # Count and average on the arrays, no per-detection Python work
+            ids, counts = _count_classes(detections.class_ids)
+            class_counts = dict(zip(self._class_names_arr[ids].tolist(), counts.tolist()))
+            avg_confidence = float(detections.confidences.mean())
+        else:
+            class_counts = {}
+            for detection in detections:
+                class_name = detection['class_name']
+                class_counts[class_name] = class_counts.get(class_name, 0) + 1
+            avg_confidence = np.mean([d['confidence'] for d in detections])
 
         return {
             "total_objects": len(detections),
             "classes": class_counts,
-            "avg_confidence": np.mean([d['confidence'] for d in detections])
+            "avg_confidence": avg_confidence
         }
 
+class DetectionWorker:
+    """
+    Run detection on a dedicated thread
+
+    Callers submit frames without waiting for inference; the worker always
+    processes the newest submitted frame and publishes its result. PyTorch
+    releases the GIL inside the forward pass, so capture, UI and WebRTC
+    threads keep running while a frame is being detected.
+    """
+
+    def __init__(self, detector, annotate=True):
+        """
+        Args:
+            detector (ObjectDetector): Detector to run
+            annotate (bool): Whether results carry an annotated frame; turn
+                off when only the detections are used
+        """
+        self.detector = detector
+        self.annotate = annotate
+        self._frames = LatestSlot()
+        self._results = LatestSlot()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the detection thread if it is not running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2):
+        """Stop the detection thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def submit(self, frame, conf_threshold=None):
+        """
+        Queue a frame for detection, replacing any frame not yet started
+
+        Args:
+            frame (numpy.ndarray): Input image frame
+            conf_threshold (float): Override confidence threshold
+        """
+        self._frames.put((frame, conf_threshold))
+
+    def get_result(self, timeout=None):
+        """
+        Wait for the next detection result
+
+        Args:
+            timeout (float): Seconds to wait, None blocks forever
+
+        Returns:
+            FrameResult: Annotated frame, detections and summary
+
+        Raises:
+            queue.Empty: If no new result arrived within timeout
+        """
+        return self._results.get(timeout)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if not self._frames.wait(timeout=0.5):
+                continue
+            frame, conf = self._frames.take()
+            self._results.put(FrameResult(*self.detector.detect_objects_detailed(
+                frame, conf, annotate=self.annotate)))
+
+class AdaptiveDetector:
+    """
+    Skip inference on frames that don't need it, for one video stream
+
+    While inference takes longer than one frame interval, only every
+    detect_every_n-th frame is detected; every frame is detected again as
+    soon as inference fits within the frame budget. Frames where no part
+    of the scene changed since the last detected frame are skipped too,
+    but never for longer than static_max_age seconds. Skipped frames get
+    the previous boxes redrawn on them, so the video stays fresh.
+
+    Use one instance per stream: the skip state compares consecutive
+    frames of the same camera.
+    """
+
+    def __init__(self, detector, detect_every_n=PERFORMANCE_CONFIG['detect_every_n'],
+                 max_fps=CAMERA_CONFIG['max_fps'],
+                 static_threshold=PERFORMANCE_CONFIG['static_frame_threshold'],
+                 static_max_age=PERFORMANCE_CONFIG['static_max_age']):
+        self.detector = detector
+        self.detect_every_n = max(1, detect_every_n)
+        self.frame_budget = 1.0 / max_fps
+        self.static_threshold = static_threshold
+        self.static_max_age = static_max_age
+        self._interval = 1
+        self._since_detect = 0
+        self._last = None  # (detections, summary) of the last detected frame
+        self._last_small = None  # its thumbnail
+        self._last_conf = None
+        self._last_time = 0.0
+
+    def _is_static(self, small, conf_threshold):
+        """Whether the scene is unchanged since the last detected frame"""
+        if small is None or self._last_small is None or small.shape != self._last_small.shape:
+            return False
+        if conf_threshold != self._last_conf:
+            return False
+        if time.monotonic() - self._last_time > self.static_max_age:
+            return False
+        # Largest change over a coarse grid, so a small object appearing in
+        # one area isn't averaged away by the rest of the frame
+        cells = cv2.resize(cv2.absdiff(small, self._last_small), (8, 6),
+                           interpolation=cv2.INTER_AREA)
+        return cells.max() < self.static_threshold
+
+    def detect_objects_detailed(self, frame, conf_threshold=None, annotate=True):
+        """
+        Same contract as ObjectDetector.detect_objects_detailed
+
+        Returns:
+            tuple: (annotated_frame, detections_list, summary_dict)
+        """
+        self._since_detect += 1
+        small = None
+        if self.static_threshold > 0:
+            small = cv2.resize(frame, (64, 48), interpolation=cv2.INTER_AREA)
+
+        due = self._last is None or self._since_detect >= self._interval
+        if due and not self._is_static(small, conf_threshold):
+            start = time.monotonic()
+            try:
+                annotated_frame, detections, summary = self.detector.detect_objects_detailed(
+                    frame, conf_threshold, annotate, raise_errors=True)
+            except Exception as e:
+                # Not remembered, the next frame is detected again
+                logger.error("Error during object detection: %s", e)
+                return frame, [], {"total_objects": 0, "classes": {}}
+            slow = time.monotonic() - start > self.frame_budget
+
+            self._interval = self.detect_every_n if slow else 1
+            self._since_detect = 0
+            self._last = (detections, summary)
+            self._last_small = small
+            self._last_conf = conf_threshold
+            self._last_time = start
+            return annotated_frame, detections, summary
+
+        detections, summary = self._last
+        if annotate:
+            frame = draw_detections(frame.copy(), detections)
+        return frame, detections, summary
+
 # Global detector instance
 _detector = None
+_detector_lock = threading.Lock()
 
 def get_detector(model_path="yolov8n.pt", confidence=0.5):
-    """Get or create detector instance"""
+    """
+    Get or create detector instance (loaded once, even across threads)
+
+    Runs on CUDA when PERFORMANCE_CONFIG['gpu_enabled'] is set and a GPU is
+    available, which is also what enables the FP16, TensorRT and cv2.dnn
+    paths.
+    """
     global _detector
     if _detector is None:
-        _detector = ObjectDetector(model_path, confidence)
+        with _detector_lock:
+            if _detector is None:
+                device = "cuda" if PERFORMANCE_CONFIG['gpu_enabled'] else "cpu"
+                detector = ObjectDetector(model_path, confidence, device)
+                detector.warmup()
+                _detector = detector  # publish only once warmed up
     return _detector
 
 def detect_objects(frame, confidence=0.5):
@@ -160,24 +887,26 @@ def detect_objects(frame, confidence=0.5):
         annotated_frame, _, _ = detector.detect_objects_detailed(frame, confidence)
         return annotated_frame
     except Exception as e:
-        logger.error(f"Error in detect_objects: {e}")
+        logger.error("Error in detect_objects: %s", e)
         # Return original frame if detection fails
         return frame
 
-def detect_objects_detailed(frame, confidence=0.5):
+def detect_objects_detailed(frame, confidence=0.5, annotate=True):
     """
     Detailed detection function returning both frame and detection info
 
     Args:
         frame (numpy.ndarray): Input image frame
         confidence (float): Confidence threshold
+        annotate (bool): Draw the detections; False skips drawing for
+            callers that only need the results
 
     Returns:
         tuple: (annotated_frame, detections_list, summary_dict)
     """
     try:
         detector = get_detector(confidence=confidence)
-        return detector.detect_objects_detailed(frame, confidence)
+        return detector.detect_objects_detailed(frame, confidence, annotate)
     except Exception as e:
-        logger.error(f"Error in detect_objects_detailed: {e}")
+        logger.error("Error in detect_objects_detailed: %s", e)
         return frame, [], {"total_objects": 0, "classes": {}}
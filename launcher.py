@@ -3,20 +3,20 @@
 Launcher script for the Real-Time Object Detection App
 """
 
+import importlib.util
 import sys
 import subprocess
 import os
 
 def check_dependencies():
     """Check if required dependencies are installed"""
-    try:
-        import streamlit
-        import cv2
-        import ultralytics
-        return True
-    except ImportError as e:
-        print(f"Missing dependency: {e}")
-        return False
+    # find_spec only locates the packages; importing them here would pay
+    # for loading torch before the app even starts
+    for module in ('streamlit', 'cv2', 'ultralytics'):
+        if importlib.util.find_spec(module) is None:
+            print(f"Missing dependency: {module}")
+            return False
+    return True
 
 def install_dependencies():
     """Install required dependencies"""
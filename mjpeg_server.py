@@ -0,0 +1,249 @@
+"""
+Lightweight MJPEG HTTP server for streaming annotated frames to the browser
+"""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from config import NETWORK_CONFIG, UI_CONFIG
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY = "frame"
+PART_HEADER = (b"--" + BOUNDARY.encode() + b"\r\n"
+               b"Content-Type: image/jpeg\r\n"
+               b"Content-Length: %d\r\n\r\n")
+
+INDEX_PAGE = (
+    '<html><body style="margin:0;background:#000">'
+    '<img src="stream.mjpg" style="width:100%;height:auto">'
+    '</body></html>'
+).encode()
+
+def encode_jpeg(frame: np.ndarray, quality: int = UI_CONFIG['jpeg_quality']) -> Optional[np.ndarray]:
+    """
+    Encode a BGR frame as JPEG
+
+    Args:
+        frame (numpy.ndarray): BGR image
+        quality (int): JPEG quality (0-100)
+
+    Returns:
+        numpy.ndarray: Encoded bytes as a uint8 array (buffer-protocol
+        compatible, so it can be written to sockets without copying),
+        or None if encoding failed
+    """
+    ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality,
+                                            cv2.IMWRITE_JPEG_OPTIMIZE, 0])
+    return jpeg if ok else None
+
+class MJPEGStream:
+    """
+    One frame channel of an MJPEGServer, e.g. one user's camera
+
+    The capture thread calls update() with each annotated BGR frame; every
+    client connected to this stream gets the newest JPEG as soon as it is
+    encoded, and the browser decodes it natively instead of going through
+    Streamlit reruns.
+    """
+
+    def __init__(self, server: "MJPEGServer", name: str):
+        self.server = server
+        self.name = name
+        self._jpeg = None
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def port(self) -> int:
+        return self.server.port
+
+    @property
+    def path(self) -> str:
+        """URL path of the stream's viewer page"""
+        return f"/{self.name}/"
+
+    def update(self, frame: np.ndarray) -> None:
+        """
+        Encode a BGR frame and publish it to the stream's clients
+
+        Args:
+            frame (numpy.ndarray): BGR image
+        """
+        jpeg = encode_jpeg(frame, self.server.quality)
+        if jpeg is None:
+            return
+
+        with self._cond:
+            self._jpeg = jpeg
+            self._seq += 1
+            self._cond.notify_all()
+
+    def wait_frame(self, last_seq: int, timeout: float = 1.0):
+        """
+        Block until a frame newer than last_seq is available
+
+        Returns:
+            tuple: (seq, jpeg_array) or (last_seq, None) on timeout
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq != last_seq, timeout):
+                return last_seq, None
+            return self._seq, self._jpeg
+
+    def wake(self) -> None:
+        """Wake any waiting clients"""
+        with self._cond:
+            self._cond.notify_all()
+
+class MJPEGServer:
+    """
+    Serve named MJPEG streams as multipart/x-mixed-replace responses
+
+    Each stream (see stream()) has its own viewer page at /<name>/ and
+    video at /<name>/stream.mjpg, so several sessions can share one port
+    without seeing each other's frames.
+    """
+
+    def __init__(self, host: str = "0.0.0.0",
+                 port: int = NETWORK_CONFIG['mjpeg_port'],
+                 quality: int = UI_CONFIG['jpeg_quality']):
+        self.host = host
+        self.port = port
+        self.quality = quality
+        self._streams = {}
+        self._streams_lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    def start(self) -> None:
+        """
+        Start serving in a background daemon thread
+
+        Raises:
+            OSError: If the port cannot be bound
+        """
+        if self._httpd is not None:
+            return
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info("MJPEG server listening on %s:%d", self.host, self.port)
+
+    def stop(self) -> None:
+        """Shut the server down and wake any waiting clients"""
+        if self._httpd is None:
+            return
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._httpd = None
+        with self._streams_lock:
+            streams = list(self._streams.values())
+        for stream in streams:
+            stream.wake()
+
+    def stream(self, name: str) -> MJPEGStream:
+        """
+        Get or create the stream with the given URL-safe name
+
+        Args:
+            name (str): Stream name, used as its URL path
+
+        Returns:
+            MJPEGStream: The stream
+        """
+        with self._streams_lock:
+            if name not in self._streams:
+                self._streams[name] = MJPEGStream(self, name)
+            return self._streams[name]
+
+    def remove_stream(self, name: str) -> None:
+        """Forget a stream; its connected clients are disconnected"""
+        with self._streams_lock:
+            stream = self._streams.pop(name, None)
+        if stream is not None:
+            stream.wake()
+
+    def _get_stream(self, name: str) -> Optional[MJPEGStream]:
+        with self._streams_lock:
+            return self._streams.get(name)
+
+def _make_handler(server: MJPEGServer):
+    class MJPEGHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            name, slash, page = self.path.lstrip("/").partition("/")
+            if name and not slash:
+                # Viewer page links to stream.mjpg relative to /<name>/
+                self.send_response(301)
+                self.send_header("Location", f"/{name}/")
+                self.end_headers()
+                return
+            stream = server._get_stream(name)
+            if stream is None:
+                self.send_error(404)
+                return
+
+            if page == "":
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(INDEX_PAGE)))
+                self.end_headers()
+                self.wfile.write(INDEX_PAGE)
+                return
+
+            if page != "stream.mjpg":
+                self.send_error(404)
+                return
+
+            self.send_response(200)
+            self.send_header("Cache-Control", "no-cache, private")
+            self.send_header("Pragma", "no-cache")
+            self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+            self.end_headers()
+
+            seq = 0
+            try:
+                while server._httpd is not None and server._get_stream(name) is stream:
+                    seq, jpeg = stream.wait_frame(seq)
+                    if jpeg is None:
+                        continue
+                    # Write the encoded array directly instead of
+                    # concatenating it into a new bytes object
+                    self.wfile.write(PART_HEADER % len(jpeg))
+                    self.wfile.write(memoryview(jpeg))
+                    self.wfile.write(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Client went away
+
+        def log_message(self, format, *args):
+            logger.debug("MJPEG %s - %s", self.address_string(), format % args)
+
+    return MJPEGHandler
+
+# Global server instance
+_server = None
+_server_lock = threading.Lock()
+
+def get_mjpeg_server(port: Optional[int] = None) -> MJPEGServer:
+    """
+    Get or create the shared, already started MJPEG server
+
+    Raises:
+        OSError: If the server's port cannot be bound; the next call
+            tries again
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            server = MJPEGServer(port=port or NETWORK_CONFIG['mjpeg_port'])
+            server.start()
+            _server = server  # only keep a server that is listening
+    return _server
@@ -6,6 +6,9 @@ Setup script for Real-Time Object Detection App
 import os
 import sys
 import subprocess
+import urllib.request
+
+MODEL_URL = 'https://github.com/ultralytics/assets/releases/download/v8.3.0/yolov8n.pt'
 
 def create_directories():
     """Create necessary directories"""
@@ -23,11 +26,9 @@ def download_model():
     if not os.path.exists(model_file):
         print("📥 Downloading YOLOv8 nano model...")
         try:
-            import ultralytics
-            from ultralytics import YOLO
-
-            # This will automatically download the model
-            model = YOLO(model_file)
+            # Download directly instead of importing ultralytics (and torch)
+            urllib.request.urlretrieve(MODEL_URL, model_file + '.part')
+            os.replace(model_file + '.part', model_file)
             print("✅ Model downloaded successfully!")
         except Exception as e:
             print(f"❌ Error downloading model: {e}")
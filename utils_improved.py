@@ -2,31 +2,158 @@
 Utility functions for the object detection app
 """
 
+import functools
+import os
 import socket
 import cv2
-import requests
 import logging
+import queue
+import threading
 import time
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+from typing import Callable, List, Dict, NamedTuple, Tuple, Optional
 import numpy as np
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from config import CAMERA_CONFIG, PERFORMANCE_CONFIG
+
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+def setup_logging(level: int = logging.INFO) -> None:
+    """
+    Configure root logging for an app entry point
+
+    Library modules only create loggers, so importing them does not install
+    handlers; each app calls this once at startup.
+
+    Args:
+        level (int): Logging level
+    """
+    logging.basicConfig(level=level)
+
+# Route resizes through OpenCV's transparent API (OpenCL) when enabled;
+# only our UMat wrap depends on it, OpenCV's global setting is left alone
+USE_OPENCL = PERFORMANCE_CONFIG['use_opencl'] and cv2.ocl.haveOpenCL()
+
+class FrameResult(NamedTuple):
+    """One processed frame, as published through a LatestSlot"""
+    frame: Optional[np.ndarray]  # annotated BGR frame, None if streamed elsewhere
+    detections: list
+    summary: dict
+    fps: float = 0.0
+
+class LatestSlot:
+    """
+    Thread-safe single-item holder that always keeps the newest value
+
+    Unlike a FIFO queue, put() overwrites anything not yet consumed, so a
+    slow consumer never works through a backlog of stale frames.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._item = None
+        self._event = threading.Event()
+
+    def put(self, item):
+        """Store item, replacing any unconsumed one"""
+        with self._lock:
+            self._item = item
+            self._event.set()
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        Wait for a new item and take it
+
+        Args:
+            timeout (float): Seconds to wait, None blocks forever
+
+        Returns:
+            The most recently stored item
+
+        Raises:
+            queue.Empty: If no new item arrived within timeout
+        """
+        if not self.wait(timeout):
+            raise queue.Empty
+        return self.take()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Sleep until an unconsumed item is available
+
+        Args:
+            timeout (float): Seconds to wait, None blocks forever
+
+        Returns:
+            bool: True if an item is ready to take()
+        """
+        return self._event.wait(timeout)
+
+    def take(self):
+        """Consume and return the latest item (call after wait() succeeds)"""
+        with self._lock:
+            self._event.clear()
+            return self._item
+
+    def peek(self):
+        """Return the latest item without consuming it (None if never set)"""
+        with self._lock:
+            return self._item
+
+class FPSCounter:
+    """Frame rate measured over roughly one-second windows"""
+
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self.fps = 0.0
+        self._count = 0
+        self._start = time.monotonic()
+
+    def tick(self) -> float:
+        """
+        Record one frame
+
+        Returns:
+            float: Frame rate of the last completed window
+        """
+        self._count += 1
+        elapsed = time.monotonic() - self._start
+        if elapsed > self.window:
+            self.fps = self._count / elapsed
+            self._count = 0
+            self._start = time.monotonic()
+        return self.fps
+
+# LAN IP found by get_local_ip, looked up once per process
+_local_ip = None
+
 def get_local_ip() -> str:
     """
     Returns the local LAN IP address (e.g. 192.168.x.x).
     Useful to open Streamlit app on other devices in same WiFi.
 
+    The address is cached after the first successful lookup; failed
+    lookups are retried on the next call.
+
     Returns:
         str: Local IP address
     """
+    global _local_ip
+    if _local_ip is not None:
+        return _local_ip
+
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
         # Connect to a remote server (doesn't need to be reachable)
         s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
+        ip = _local_ip = s.getsockname()[0]
     except Exception:
         ip = "127.0.0.1"
     finally:
@@ -45,8 +172,11 @@ def test_camera_connection(url: str, timeout: int = 5) -> Tuple[bool, str]:
         tuple: (success: bool, message: str)
     """
     try:
-        cap = cv2.VideoCapture(url)
-        cap.set(cv2.CAP_PROP_TIMEOUT, timeout * 1000)  # Convert to milliseconds
+        # Timeouts must be given when opening; they bound both the connect
+        # and the first read
+        timeout_ms = int(timeout * 1000)
+        cap = cv2.VideoCapture(url, cv2.CAP_ANY, [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+                                                  cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms])
 
         if not cap.isOpened():
             cap.release()
@@ -64,6 +194,293 @@ def test_camera_connection(url: str, timeout: int = 5) -> Tuple[bool, str]:
     except Exception as e:
         return False, f"Connection error: {str(e)}"
 
+def _http_reachable(url: str, timeout: float = 0.5) -> bool:
+    """
+    Cheap pre-check that something is listening at an HTTP camera URL
+
+    Only opens a TCP connection to the host and port; whether the path
+    serves video is left to the full check.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)  # ValueError if not numeric
+        if not parts.hostname:
+            return False
+        socket.create_connection((parts.hostname, port), timeout=timeout).close()
+    except (OSError, ValueError):
+        return False
+    return True
+
+def _probe(url: str, timeout: int) -> Tuple[bool, str]:
+    if url.lower().startswith(("http://", "https://")) and not _http_reachable(url):
+        return False, "Cannot connect to camera host"
+    return test_camera_connection(url, timeout)
+
+def probe_all(urls: List[str], timeout: int = 5,
+              stop_on_success: bool = False) -> Dict[str, Tuple[bool, str]]:
+    """
+    Test several camera URLs in parallel
+
+    HTTP URLs are first checked with a quick TCP connect, so unreachable
+    candidates fail fast instead of waiting for OpenCV to time out.
+
+    Args:
+        urls (list): Camera URLs to test
+        timeout (int): Timeout in seconds per URL
+        stop_on_success (bool): Return as soon as one URL works, without
+            waiting for the remaining probes
+
+    Returns:
+        dict: URL to (success, message) for every probe that finished
+    """
+    results = {}
+    if not urls:
+        return results
+
+    executor = ThreadPoolExecutor(max_workers=len(urls))
+    futures = {executor.submit(_probe, url, timeout): url for url in urls}
+    try:
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if stop_on_success and results[futures[future]][0]:
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+        # Unfinished probes end on their own timeouts in the background
+        executor.shutdown(wait=False)
+
+    return results
+
+class AVCapture:
+    """
+    Minimal cv2.VideoCapture-compatible reader built on PyAV
+
+    Opens the stream with FFmpeg's input buffering disabled and hands over
+    each frame as soon as it is decoded, avoiding the extra frames of
+    latency OpenCV's capture queue adds on network streams. Only the
+    methods the apps use are implemented.
+    """
+
+    def __init__(self, url: str):
+        options = {'fflags': 'nobuffer', 'flags': 'low_delay'}
+        if url.lower().startswith("rtsp://"):
+            options['rtsp_transport'] = 'udp'
+
+        self._container = av.open(url, options=options,
+                                  timeout=CAMERA_CONFIG['timeout'] / 1000)
+        self._frames = self._container.decode(video=0)
+        self._frame = None
+
+    def isOpened(self) -> bool:
+        return self._container is not None
+
+    def set(self, prop_id: int, value) -> bool:
+        """Capture properties are not supported; always returns False"""
+        return False
+
+    def grab(self) -> bool:
+        """Decode the next frame without converting it to an array"""
+        try:
+            self._frame = next(self._frames)
+            return True
+        except (StopIteration, av.error.FFmpegError):
+            self._frame = None
+            return False
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Convert the last grabbed frame to a BGR array"""
+        if self._frame is None:
+            return False, None
+        return True, self._frame.to_ndarray(format='bgr24')
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self) -> None:
+        if self._container is not None:
+            self._container.close()
+            self._container = None
+
+def open_camera(url: str, buffer_size: int = CAMERA_CONFIG['buffer_size'],
+                backend: str = CAMERA_CONFIG['backend']):
+    """
+    Open a camera stream with minimal internal buffering
+
+    Args:
+        url (str): Camera URL (HTTP/MJPEG, RTSP or device)
+        buffer_size (int): Number of frames the backend may queue
+        backend (str): 'opencv' or 'av' (PyAV, falls back to OpenCV if
+            PyAV is missing or cannot open the stream)
+
+    Returns:
+        cv2.VideoCapture or AVCapture: Opened (or failed) capture object
+    """
+    if backend == 'av' and AV_AVAILABLE:
+        try:
+            return AVCapture(url)
+        except Exception as e:
+            logger.warning("PyAV could not open %s, falling back to OpenCV: %s", url, e)
+
+    if url.lower().startswith("rtsp://"):
+        # Must be set before the FFmpeg backend is initialised
+        os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS",
+                              "rtsp_transport;udp|buffer_size;102400")
+
+    cap = cv2.VideoCapture(url)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return cap
+
+def read_latest_frame(cap: cv2.VideoCapture,
+                      budget: float = 0.1,
+                      fresh_after: float = 0.005) -> Tuple[bool, Optional[np.ndarray]]:
+    """
+    Read the most recent frame, skipping anything already buffered
+
+    Frames are grabbed (not decoded) until a grab has to wait for the
+    source, which means the backend queue is empty and the frame is fresh.
+    Only that last frame is decoded.
+
+    Args:
+        cap (cv2.VideoCapture): Opened capture object
+        budget (float): Maximum time in seconds to spend draining
+        fresh_after (float): A grab slower than this is treated as live
+
+    Returns:
+        tuple: (success: bool, frame: numpy.ndarray or None)
+    """
+    deadline = time.monotonic() + budget
+    grabbed = False
+
+    while True:
+        start = time.monotonic()
+        if not cap.grab():
+            break
+        grabbed = True
+        if time.monotonic() - start >= fresh_after or start >= deadline:
+            break
+
+    if not grabbed:
+        return False, None
+
+    return cap.retrieve()
+
+def run_capture_loop(cap: cv2.VideoCapture, out_slot: LatestSlot,
+                     stop_event: threading.Event,
+                     process_frame: Optional[Callable] = None,
+                     max_failures: int = CAMERA_CONFIG['retry_attempts']) -> int:
+    """
+    Read frames, process them and publish the results until stopped
+
+    Args:
+        cap (cv2.VideoCapture): Opened capture object
+        out_slot (LatestSlot): Receives each processed result
+        stop_event (threading.Event): Set to end the loop
+        process_frame (callable): Maps a BGR frame to the item to publish;
+            returning None publishes nothing. Frames are published as is
+            if not given
+        max_failures (int): Consecutive failed reads before giving up
+
+    Returns:
+        int: Number of frames processed
+    """
+    processed = 0
+    failures = 0
+
+    while not stop_event.is_set():
+        ret, frame = read_latest_frame(cap)
+        if not ret:
+            failures += 1
+            if failures > max_failures:
+                logger.warning("Camera stopped delivering frames")
+                break
+            stop_event.wait(CAMERA_CONFIG['retry_delay'])
+            continue
+
+        failures = 0
+        item = process_frame(frame) if process_frame is not None else frame
+        if item is not None:
+            out_slot.put(item)
+        processed += 1
+
+    return processed
+
+class CameraStream:
+    """
+    Keep one camera open and read it on a background thread
+
+    The capture is opened once and drained continuously, so callers never
+    pay for reopening the stream and always see the newest frame;
+    frames nobody picked up in time are dropped.
+    """
+
+    def __init__(self, url: str, process_frame: Optional[Callable] = None,
+                 stop_event: Optional[threading.Event] = None):
+        """
+        Args:
+            url (str): Camera URL
+            process_frame (callable): Applied to each frame before it is
+                published, see run_capture_loop
+            stop_event (threading.Event): Event that stops the stream, for
+                sharing with other threads; set when the stream ends
+        """
+        self.url = url
+        self.process_frame = process_frame
+        self.stop_event = stop_event or threading.Event()
+        self.slot = LatestSlot()
+        self._thread = None
+
+    def start(self) -> bool:
+        """
+        Open the camera and start reading in the background
+
+        Returns:
+            bool: False if the camera could not be opened
+        """
+        cap = open_camera(self.url)
+        width, height = CAMERA_CONFIG['default_resolution']
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_FPS, CAMERA_CONFIG['max_fps'])
+
+        if not cap.isOpened():
+            cap.release()
+            return False
+
+        self._thread = threading.Thread(target=self._run, args=(cap,), daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 2) -> None:
+        """Signal the capture thread to stop and wait up to timeout seconds"""
+        self.stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def is_running(self) -> bool:
+        """Whether the capture thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self):
+        """Newest published frame without waiting, or None before the first"""
+        return self.slot.peek()
+
+    def _run(self, cap: cv2.VideoCapture) -> None:
+        try:
+            run_capture_loop(cap, self.slot, self.stop_event, self.process_frame)
+        finally:
+            cap.release()
+            self.stop_event.set()  # camera gone, let consumers finish
+
+# Common DroidCam URL patterns, every port with every stream path
+_DROIDCAM_TEMPLATES = tuple(
+    f"http://{{ip}}:{port}{path}"
+    for port in (4747, 4748, 5050, 8080)
+    for path in ("/video", "/mjpeg.mjpg", "/stream")
+)
+
 def get_droidcam_urls(base_ip: str) -> List[str]:
     """
     Generate common DroidCam URL patterns for a given IP
@@ -74,17 +491,33 @@ def get_droidcam_urls(base_ip: str) -> List[str]:
     Returns:
         list: List of possible DroidCam URLs
     """
-    ports = [4747, 4748, 5050, 8080]
-    urls = []
+    return [template.format(ip=base_ip) for template in _DROIDCAM_TEMPLATES]
 
-    for port in ports:
-        urls.extend([
-            f"http://{base_ip}:{port}/video",
-            f"http://{base_ip}:{port}/mjpeg.mjpg",
-            f"http://{base_ip}:{port}/stream",
-        ])
+@functools.lru_cache(maxsize=8)
+def _plan(width: int, height: int, max_width: int, max_height: int) -> Optional[Tuple[int, int, Optional[int]]]:
+    """
+    Work out how to shrink a frame size; cached since it rarely changes
 
-    return urls
+    Returns:
+        tuple or None: (new_width, new_height, interpolation), where an
+        interpolation of None means an exact halving done with pyrDown,
+        or None if the frame should be left as is
+    """
+    # Calculate scaling factor
+    scale_w = max_width / width
+    scale_h = max_height / height
+    scale = min(scale_w, scale_h, 1.0)  # Don't upscale
+
+    if scale >= 0.98:
+        return None  # Not worth a resize
+
+    new_width = int(width * scale)
+    new_height = int(height * scale)
+    if new_width * 2 == width and new_height * 2 == height:
+        return new_width, new_height, None
+    # Bilinear is faster than INTER_AREA and looks the same around 2x
+    interpolation = cv2.INTER_LINEAR if 0.4 < scale < 0.6 else cv2.INTER_AREA
+    return new_width, new_height, interpolation
 
 def optimize_frame_for_detection(frame: np.ndarray, 
                                 max_width: int = 640,
@@ -98,21 +531,22 @@ def optimize_frame_for_detection(frame: np.ndarray,
         max_height (int): Maximum height
 
     Returns:
-        numpy.ndarray: Resized frame
+        numpy.ndarray: Resized frame, or the input frame if already small enough
     """
     height, width = frame.shape[:2]
+    plan = _plan(width, height, max_width, max_height)
+    if plan is None:
+        return frame
 
-    # Calculate scaling factor
-    scale_w = max_width / width
-    scale_h = max_height / height
-    scale = min(scale_w, scale_h, 1.0)  # Don't upscale
-
-    if scale < 1.0:
-        new_width = int(width * scale)
-        new_height = int(height * scale)
-        frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
+    new_width, new_height, interpolation = plan
+    # Resize on the OpenCL device, download once for detection
+    src = cv2.UMat(frame) if USE_OPENCL else frame
+    if interpolation is None:
+        frame = cv2.pyrDown(src)
+    else:
+        frame = cv2.resize(src, (new_width, new_height), interpolation=interpolation)
 
-    return frame
+    return frame.get() if USE_OPENCL else frame
 
 # Camera configuration presets
 CAMERA_PRESETS = {